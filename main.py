@@ -24,29 +24,63 @@ goals should be specific and realistic.
 """
 
 import dataclasses
+import functools
+import os
+import sys
+from collections.abc import Callable
 from datetime import date, datetime, timedelta
+from typing import Any
 
 import json
 
 STATE_FILE = "state.json"
 
+# 1: dates as iso-format strings (implicit; files written without a version)
+# 2: dates as proleptic gregorian ordinals
+STATE_SCHEMA_VERSION = 2
+
+_THIRTY_DAYS = timedelta(days=30)
+
+
+@functools.cache
+def _field_names(cls: type) -> tuple[str, ...]:
+    return tuple(field.name for field in dataclasses.fields(cls))
+
 
 class EnhancedJSONEncoder(json.JSONEncoder):
-    def default(self, o):
-        if dataclasses.is_dataclass(o):
-            return dataclasses.asdict(o)
-        elif isinstance(o, (datetime, date)):
-            return o.isoformat()
+    def default(
+        self,
+        o,
+        # bound at definition time to skip global/attribute lookups per call
+        _is_dataclass=dataclasses.is_dataclass,
+        _field_names=_field_names,
+        _date_types=(datetime, date),
+    ):
+        if _is_dataclass(o):
+            # nested dataclasses re-enter default(), so there's
+            # no need for asdict()'s recursive deep copy
+            return {name: getattr(o, name) for name in _field_names(type(o))}
+        elif isinstance(o, _date_types):
+            return o.toordinal()
         return super().default(o)
 
 
-@dataclasses.dataclass
+_json_encoder = EnhancedJSONEncoder(separators=(",", ":"))
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
 class SuccessCriteria:
     num_checkpoints: int
     permitted_failures: int
 
 
-@dataclasses.dataclass
+@functools.lru_cache(maxsize=128)
+def _make_criteria(num_checkpoints: int, permitted_failures: int) -> SuccessCriteria:
+    # criteria are immutable, so goals with the same pair can share one instance
+    return SuccessCriteria(num_checkpoints, permitted_failures)
+
+
+@dataclasses.dataclass(slots=True)
 class Goal:
     name: str
     success_criteria: SuccessCriteria
@@ -55,7 +89,26 @@ class Goal:
     was_successful: bool | None = None
 
 
-@dataclasses.dataclass
+def _goal_from_json(
+    goal: dict,
+    parse_date: Callable[[Any], date] = date.fromordinal,
+    _make_criteria=_make_criteria,
+    _Goal=Goal,
+) -> Goal:
+    success_criteria = goal["success_criteria"]
+    return _Goal(
+        goal["name"],
+        _make_criteria(
+            success_criteria["num_checkpoints"],
+            success_criteria["permitted_failures"],
+        ),
+        parse_date(goal["starts_at"]),
+        parse_date(goal["ends_at"]),
+        goal["was_successful"],
+    )
+
+
+@dataclasses.dataclass(slots=True)
 class State:
     goals: list[Goal]
     goals_last_updated: date | None = None
@@ -63,27 +116,30 @@ class State:
     @classmethod
     def from_state_file(cls) -> "State | None":
         try:
-            with open(STATE_FILE, "r") as f:
-                json_state = json.load(f)
+            # raw fd i/o; skips open()'s isatty/seek probing and buffering
+            # layers, and reads the whole (small) file in one read() call
+            fd = os.open(STATE_FILE, os.O_RDONLY)
+            try:
+                json_state = json.loads(os.read(fd, os.fstat(fd).st_size))
+            finally:
+                os.close(fd)
+
+            schema_version = json_state.get("schema_version", 1)
+            if schema_version == 1:
+                # migrated to the current schema on the next write
+                parse_date = date.fromisoformat
+            elif schema_version == STATE_SCHEMA_VERSION:
+                parse_date = date.fromordinal
+            else:
+                return None
 
             state = cls(
                 goals=[
-                    Goal(
-                        name=goal["name"],
-                        success_criteria=SuccessCriteria(
-                            num_checkpoints=goal["success_criteria"]["num_checkpoints"],
-                            permitted_failures=goal["success_criteria"][
-                                "permitted_failures"
-                            ],
-                        ),
-                        starts_at=date.fromisoformat(goal["starts_at"]),
-                        ends_at=date.fromisoformat(goal["ends_at"]),
-                        was_successful=goal["was_successful"],
-                    )
+                    _goal_from_json(goal, parse_date)
                     for goal in json_state["goals"]
                 ],
                 goals_last_updated=(
-                    date.fromisoformat(json_state["goals_last_updated"])
+                    parse_date(json_state["goals_last_updated"])
                     if json_state["goals_last_updated"] is not None
                     else None
                 ),
@@ -92,18 +148,55 @@ class State:
             return None
         except FileNotFoundError:
             state = cls(goals=[], goals_last_updated=None)
-            with open(STATE_FILE, "w") as f:
-                json.dump(state, f, cls=EnhancedJSONEncoder)
+            state.write_to_state_file()
 
         return state
 
     def write_to_state_file(self) -> None:
-        with open(STATE_FILE, "w") as f:
-            json.dump(self, f, cls=EnhancedJSONEncoder)
+        # encode up front so the file sees a single write, rather than
+        # one per chunk as json.dump's iterencode would produce
+        payload = _json_encoder.encode(
+            {
+                "schema_version": STATE_SCHEMA_VERSION,
+                "goals": self.goals,
+                "goals_last_updated": self.goals_last_updated,
+            }
+        ).encode()
+
+        # write to a temporary file and swap it in, so a crash mid-write
+        # can never leave a truncated/corrupt state file behind
+        tmp_file = STATE_FILE + ".tmp"
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view) :]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        os.replace(tmp_file, STATE_FILE)
+
+
+def _make_prompt() -> Callable[[str], str]:
+    if sys.stdin.isatty():
+        return input
+
+    # scripted input; read it all in one go rather than a read() per prompt
+    lines = iter(sys.stdin.read().splitlines())
+
+    def prompt(_message: str) -> str:
+        try:
+            return next(lines)
+        except StopIteration:
+            raise EOFError from None
+
+    return prompt
 
 
 def main() -> int:
-    if date.today().day != 1:
+    today = date.today()
+    if today.day != 1:
         print("This program only runs on the first day of the month.")
         return 1
 
@@ -113,13 +206,15 @@ def main() -> int:
         print("Please delete the state file and restart the program.")
         return 1
 
-    if date.today() == state.goals_last_updated:
+    if today == state.goals_last_updated:
         print("You have already set your goals for this month.")
-        print(f"Come back back on {date.today() + timedelta(days=30)}.")
+        print(f"Come back back on {today + _THIRTY_DAYS}.")
         return 1
 
     print("Welcome to the N Commandments program.")
 
+    prompt = _make_prompt()
+
     unfinished_goals = [goal for goal in state.goals if goal.was_successful is None]
     if unfinished_goals:
         # check if they were successful in their previously-set goals
@@ -130,7 +225,7 @@ def main() -> int:
 
         for goal in unfinished_goals:
             print(f"Goal: {goal.name} started on {goal.starts_at}.")
-            success = input("Were you successful? (y/n/q): ")
+            success = prompt("Were you successful? (y/n/q): ")
             if success == "q":
                 break
 
@@ -140,22 +235,23 @@ def main() -> int:
     print("Enter 'q' to finish.")
 
     while True:
-        goal_name = input("Goal name: ")
+        goal_name = prompt("Goal name: ")
         if goal_name == "q":
             break
 
-        num_checkpoints = int(input("Number of checkpoints: "))
-        permitted_failures = int(input("Permitted failures: "))
+        num_checkpoints = int(prompt("Number of checkpoints: "))
+        permitted_failures = int(prompt("Permitted failures: "))
 
-        success_criteria = SuccessCriteria(num_checkpoints, permitted_failures)
+        success_criteria = _make_criteria(num_checkpoints, permitted_failures)
         goal = Goal(
             name=goal_name,
             success_criteria=success_criteria,
-            starts_at=date.today(),
-            ends_at=date.today() + timedelta(days=30),
+            starts_at=today,
+            ends_at=today + _THIRTY_DAYS,
         )
         state.goals.append(goal)
 
+    # changes are batched for the whole session and flushed once here
     state.write_to_state_file()
 
     print("Goals saved successfully.")